@@ -1,15 +1,22 @@
 # app.py - EcoVision: Climate Visualizer API
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from flask_mysqldb import MySQL
 from flask_caching import Cache
 from flasgger import Swagger
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import MySQLdb
+import numpy as np
+import orjson
+import db
 from logger import logger
-from utils.constants import QUALITY_VALUES, QUALITY_WEIGHTS
-from utils.validators import is_valid_int, is_valid_date, is_valid_date_range
-from utils.config import get_versioned_cache_key, DERIVED_VER_KEY, ALGO_VER_KEY, DERIVED_DATA_VERSION, ALGO_VERSION
-from utils.helpers import clear_old_versioned_cache_keys
+from utils.constants import QUALITY_VALUES, QUALITY_VALUES_SET, QUALITY_AT_LEAST, QUALITY_WEIGHTS
+from utils.validators import is_valid_int, is_valid_date, is_valid_date_range, covers_whole_months
+from utils.config import get_versioned_cache_key, get_cache_tag, DERIVED_VER_KEY, ALGO_VER_KEY, DERIVED_DATA_VERSION, ALGO_VERSION, SHARED_CACHE_TIMEOUT, LOCAL_CACHE_TIMEOUT
+from utils.helpers import clear_old_versioned_cache_keys, cached_json_get, cached_json_set
+from utils.kernels import trend_kernel, warm_trend_kernel, DIRECTION_NAMES
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
@@ -25,17 +32,91 @@ limiter = Limiter(
     default_limits=[]
 )
 
-app.config['MYSQL_HOST'] = os.environ.get('MYSQL_HOST', 'localhost')
-app.config['MYSQL_USER'] = os.environ.get('MYSQL_USER', 'root')
-app.config['MYSQL_PASSWORD'] = os.environ.get('MYSQL_PASSWORD', '')
-app.config['MYSQL_DB'] = os.environ.get('MYSQL_DB', 'climate_data')
-mysql = MySQL(app)
+db.init_app(app)
 
-cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+# Redis is shared by all worker processes; fall back to in-memory SimpleCache when it isn't configured
+# Eviction is left to the Redis server: run it with maxmemory and maxmemory-policy volatile-lru (see README)
+if os.environ.get('CACHE_REDIS_URL'):
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_URL': os.environ['CACHE_REDIS_URL'],
+        'CACHE_KEY_PREFIX': 'ecovision:'
+    })
+    DERIVED_CACHE_TIMEOUT = SHARED_CACHE_TIMEOUT
+else:
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+    DERIVED_CACHE_TIMEOUT = LOCAL_CACHE_TIMEOUT
+
+# Season names for trends, indexed by the season index computed in SQL
+_SEASON_NAMES = ("winter", "spring", "summer", "fall")
+
+# Column layout of the readings fetched for trends (day = TO_DAYS(date), quality = 1-based index into QUALITY_VALUES)
+_READING_DTYPE = np.dtype([('metric_id', 'i4'), ('day', 'f8'), ('value', 'f8'), ('quality', 'i1')])
+_QUALITY_CODE_SQL = "FIELD(LOWER(c.quality), %s)" % ", ".join(f"'{q}'" for q in QUALITY_VALUES)
+
+# Compile the trends kernel at startup rather than on the first request
+warm_trend_kernel()
+
+# Shared pool for trends work: per-metric kernel runs and the seasonal query.
+# Each seasonal query holds a pooled DB connection, so keep this well below db.POOL_SIZE.
+_TRENDS_WORKERS = 4
+_trends_executor = ThreadPoolExecutor(max_workers=_TRENDS_WORKERS, thread_name_prefix="trends")
+
+# Whole-month /trends requests read seasonal aggregates from climate_data_monthly (built by seed_db.py).
+# Set TRENDS_USE_ROLLUP=0 to always aggregate the raw readings instead.
+_USE_MONTHLY_ROLLUP = os.environ.get('TRENDS_USE_ROLLUP', '1') == '1'
+
+# MySQL error code for a missing table
+ER_NO_SUCH_TABLE = 1146
+
+def _fetch_rollup_seasons(query, params):
+    """
+    Run the seasonal query against the monthly rollup.
+    Returns None if the rollup table doesn't exist yet (database not re-seeded since it was added).
+    """
+    try:
+        return db.fetch_all(query, params)
+    except MySQLdb.ProgrammingError as e:
+        # Only a missing table means "not migrated yet"; anything else is a real query error
+        if e.args[0] != ER_NO_SUCH_TABLE:
+            raise
+        logger.warning("Monthly rollup unavailable, aggregating raw readings: %s", e)
+        return None
+
+def _compute_metric_trend(group):
+    """
+    Run the trends kernel on one metric's readings and build its anomaly list.
+    Returns (direction, rate, anomalies).
+    """
+    values = np.ascontiguousarray(group['value'])
+    direction_code, rate, mean, anomaly_mask = trend_kernel(np.ascontiguousarray(group['day']), values)
+    anomalies = [
+        {
+            # TO_DAYS counts from year 0, Python ordinals from year 1
+            "date": date.fromordinal(int(day) - 365).isoformat(),
+            "value": value,
+            "deviation": abs(value - mean),
+            "quality": QUALITY_VALUES[quality - 1]
+        }
+        for day, value, quality in zip(
+            group['day'][anomaly_mask].tolist(),
+            values[anomaly_mask].tolist(),
+            group['quality'][anomaly_mask].tolist()
+        )
+    ]
+    return DIRECTION_NAMES[direction_code], rate, anomalies
 
 def error_response(message, status=400):
     return jsonify({"error": message}), status
 
+def ojsonify(obj, status=200):
+    """
+    Serialize a response body with orjson (C implementation, numpy-aware) instead of the stdlib json used by jsonify.
+    Already-serialized JSON bytes (e.g. from the cache) are sent as-is.
+    """
+    body = obj if isinstance(obj, bytes) else orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return app.response_class(body, status=status, mimetype='application/json')
+
 @app.route('/api/v1/climate', methods=['GET'])
 def get_climate_data():
     """
@@ -178,10 +259,10 @@ def get_climate_data():
             return error_response("page must be a positive integer.", 400)
         if per_page and not is_valid_int(per_page):
             return error_response("per_page must be a positive integer.", 400)
-        if quality_threshold and quality_threshold.lower() not in [q.lower() for q in QUALITY_VALUES]:
+        if quality_threshold and quality_threshold.lower() not in QUALITY_VALUES_SET:
             return error_response("Invalid quality_threshold value.", 400)
         if metric:
-            cur = mysql.connection.cursor()
+            cur = db.get_db().cursor()
             cur.execute("SELECT COUNT(*) FROM metrics WHERE LOWER(name) = %s", (metric.lower(),))
             if cur.fetchone()[0] == 0:
                 cur.close()
@@ -208,10 +289,9 @@ def get_climate_data():
             params.append(metric.lower())
         if quality_threshold:
             # Case-insensitive comparison for quality
-            threshold_index = [q.lower() for q in QUALITY_VALUES].index(quality_threshold.lower())
-            allowed_qualities = [q for q in QUALITY_VALUES[threshold_index:]]
+            allowed_qualities = QUALITY_AT_LEAST[quality_threshold.lower()]
             where_clauses.append("LOWER(c.quality) IN (%s)" % ','.join(['%s'] * len(allowed_qualities)))
-            params.extend([q.lower() for q in allowed_qualities])
+            params.extend(allowed_qualities)
 
         where_sql = " AND ".join(where_clauses)
         if where_sql:
@@ -241,7 +321,7 @@ def get_climate_data():
 
         params.extend([per_page, offset])
 
-        cur = mysql.connection.cursor()
+        cur = db.get_db().cursor()
         cur.execute(query, tuple(params))
         rows = cur.fetchall()
 
@@ -271,18 +351,19 @@ def get_climate_data():
         total_count = cur.fetchone()[0]
         cur.close()
 
-        logger.info(f"Fetched climate data for location_id={location_id}, metric={metric}, page={page}, per_page={per_page}, returned_ids={[d['id'] for d in data]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Fetched climate data for location_id=%s, metric=%s, page=%s, per_page=%s, returned_ids=%s", location_id, metric, page, per_page, [d['id'] for d in data])
 
-        return jsonify({
+        return ojsonify({
             "data": data,
             "meta": {
                 "total_count": total_count,
                 "page": page,
                 "per_page": per_page
             }
-        }), 200
+        }, 200)
     except Exception as e:
-        logger.error(f"Error fetching climate data for location_id={location_id}, metric={metric}, page={page}: {str(e)}")
+        logger.error("Error fetching climate data for location_id=%s, metric=%s, page=%s: %s", location_id, metric, page, e)
         return error_response(f"Failed to fetch climate data: {str(e)}", 500)
 
 @app.route('/api/v1/locations', methods=['GET'])
@@ -328,7 +409,7 @@ def get_locations():
             error: "Database error."
     """
     try:
-        cur = mysql.connection.cursor()
+        cur = db.get_db().cursor()
         cur.execute("SELECT id, name, country, latitude, longitude FROM locations")
         rows = cur.fetchall()
         data = [
@@ -343,11 +424,12 @@ def get_locations():
         ]
         cur.close()
 
-        logger.info(f"Fetched locations, returned_ids={[d['id'] for d in data]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Fetched locations, returned_ids=%s", [d['id'] for d in data])
 
         return jsonify({"data": data}), 200
     except Exception as e:
-        logger.error(f"Error fetching locations: {str(e)}")
+        logger.error("Error fetching locations: %s", e)
         return error_response(f"Failed to fetch locations: {str(e)}", 500)
 
 @app.route('/api/v1/metrics', methods=['GET'])
@@ -391,7 +473,7 @@ def get_metrics():
             error: "Database error."
     """
     try:
-        cur = mysql.connection.cursor()
+        cur = db.get_db().cursor()
         cur.execute("SELECT id, name, display_name, unit, description FROM metrics")
         rows = cur.fetchall()
         data = [
@@ -406,11 +488,12 @@ def get_metrics():
         ]
         cur.close()
 
-        logger.info(f"Fetched metrics, returned_ids={[d['id'] for d in data]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Fetched metrics, returned_ids=%s", [d['id'] for d in data])
 
         return jsonify({"data": data}), 200
     except Exception as e:
-        logger.error(f"Error fetching metrics: {str(e)}")
+        logger.error("Error fetching metrics: %s", e)
         return error_response(f"Failed to fetch metrics: {str(e)}", 500)
 
 @app.route('/api/v1/summary', methods=['GET'])
@@ -510,10 +593,10 @@ def get_summary():
     try:
         args = request.args
         cache_key = get_versioned_cache_key("summary", args)
-        cached = cache.get(cache_key)
+        cached = cached_json_get(cache, cache_key)
         if cached:
-            logger.info(f"Cache hit for summary: {cache_key}")
-            return jsonify(cached), 200
+            logger.info("Cache hit for summary: %s", cache_key)
+            return ojsonify(cached, 200)
 
         location_id = args.get('location_id')
         start_date = args.get('start_date')
@@ -530,10 +613,10 @@ def get_summary():
             return error_response("end_date must be in YYYY-MM-DD format.", 400)
         if start_date and end_date and not is_valid_date_range(start_date, end_date):
             return error_response("end_date must be greater than or equal to start_date.", 400)
-        if quality_threshold and quality_threshold.lower() not in [q.lower() for q in QUALITY_VALUES]:
+        if quality_threshold and quality_threshold.lower() not in QUALITY_VALUES_SET:
             return error_response("Invalid quality_threshold value.", 400)
         if metric:
-            cur = mysql.connection.cursor()
+            cur = db.get_db().cursor()
             cur.execute("SELECT COUNT(*) FROM metrics WHERE LOWER(name) = %s", (metric.lower(),))
             if cur.fetchone()[0] == 0:
                 cur.close()
@@ -556,10 +639,9 @@ def get_summary():
             where_clauses.append("LOWER(m.name) = %s")
             params.append(metric.lower())
         if quality_threshold:
-            threshold_index = [q.lower() for q in QUALITY_VALUES].index(quality_threshold.lower())
-            allowed_qualities = [q for q in QUALITY_VALUES[threshold_index:]]
+            allowed_qualities = QUALITY_AT_LEAST[quality_threshold.lower()]
             where_clauses.append("LOWER(c.quality) IN (%s)" % ','.join(['%s'] * len(allowed_qualities)))
-            params.extend([q.lower() for q in allowed_qualities])
+            params.extend(allowed_qualities)
 
         where_sql = " AND ".join(where_clauses)
         if where_sql:
@@ -576,7 +658,7 @@ def get_summary():
             {where_sql}
         """
 
-        cur = mysql.connection.cursor()
+        cur = db.get_db().cursor()
         cur.execute(query, tuple(params))
         rows = cur.fetchall()
         cur.close()
@@ -624,11 +706,11 @@ def get_summary():
             summary_data[metric_name] = metric_summary
 
         result = {"data": summary_data}
-        cache.set(cache_key, result, timeout=600)
-        logger.info(f"Cache set for summary: {cache_key}")
-        return jsonify(result), 200
+        cached_json_set(cache, cache_key, result, get_cache_tag(location_id, metric), timeout=DERIVED_CACHE_TIMEOUT)
+        logger.info("Cache set for summary: %s", cache_key)
+        return ojsonify(result, 200)
     except Exception as e:
-        logger.error(f"Error fetching summary for location_id={location_id}, metric={metric}, quality_threshold={quality_threshold}: {str(e)}")
+        logger.error("Error fetching summary for location_id=%s, metric=%s, quality_threshold=%s: %s", location_id, metric, quality_threshold, e)
         return error_response(f"Failed to fetch summary: {str(e)}", 500)
 
 @app.route('/api/v1/trends', methods=['GET'])
@@ -763,10 +845,10 @@ def get_trends():
     try:
         args = request.args
         cache_key = get_versioned_cache_key("trends", args)
-        cached = cache.get(cache_key)
+        cached = cached_json_get(cache, cache_key)
         if cached:
-            logger.info(f"Cache hit for trends: {cache_key}")
-            return jsonify(cached), 200
+            logger.info("Cache hit for trends: %s", cache_key)
+            return ojsonify(cached, 200)
 
         location_id = args.get('location_id')
         start_date = args.get('start_date')
@@ -783,10 +865,10 @@ def get_trends():
             return error_response("end_date must be in YYYY-MM-DD format.", 400)
         if start_date and end_date and not is_valid_date_range(start_date, end_date):
             return error_response("end_date must be greater than or equal to start_date.", 400)
-        if quality_threshold and quality_threshold.lower() not in [q.lower() for q in QUALITY_VALUES]:
+        if quality_threshold and quality_threshold.lower() not in QUALITY_VALUES_SET:
             return error_response("Invalid quality_threshold value.", 400)
         if metric:
-            cur = mysql.connection.cursor()
+            cur = db.get_db().cursor()
             cur.execute("SELECT COUNT(*) FROM metrics WHERE LOWER(name) = %s", (metric.lower(),))
             if cur.fetchone()[0] == 0:
                 cur.close()
@@ -809,57 +891,154 @@ def get_trends():
             where_clauses.append("LOWER(m.name) = %s")
             params.append(metric.lower())
         if quality_threshold:
-            threshold_index = [q.lower() for q in QUALITY_VALUES].index(quality_threshold.lower())
-            allowed_qualities = [q for q in QUALITY_VALUES[threshold_index:]]
+            allowed_qualities = QUALITY_AT_LEAST[quality_threshold.lower()]
             where_clauses.append("LOWER(c.quality) IN (%s)" % ','.join(['%s'] * len(allowed_qualities)))
-            params.extend([q.lower() for q in allowed_qualities])
+            params.extend(allowed_qualities)
 
         where_sql = " AND ".join(where_clauses)
         if where_sql:
             where_sql = "WHERE " + where_sql
 
-        # --- Fetch metric units for all metrics ---
-        cur = mysql.connection.cursor()
-        cur.execute("SELECT name, unit FROM metrics")
-        metric_units = {row[0]: row[1] for row in cur.fetchall()}
+        # --- Seasonal aggregates (season index = MOD(month, 12) DIV 3: 0=winter .. 3=fall) ---
+        # value is a FLOAT column; averaging it as DECIMAL keeps e.g. 21.3 from coming back as 21.2999992...
+        raw_season_query = f"""
+            SELECT
+                metric,
+                season,
+                AVG(CAST(value AS DECIMAL(12, 4))),
+                COUNT(*),
+                MAX(first_val),
+                MAX(last_val)
+            FROM (
+                SELECT
+                    m.name AS metric,
+                    MOD(MONTH(c.date), 12) DIV 3 AS season,
+                    c.value,
+                    FIRST_VALUE(c.value) OVER w AS first_val,
+                    LAST_VALUE(c.value) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS last_val
+                FROM climate_data c
+                JOIN metrics m ON c.metric_id = m.id
+                {where_sql}
+                WINDOW w AS (PARTITION BY m.name, MOD(MONTH(c.date), 12) DIV 3 ORDER BY c.date)
+            ) seasonal
+            GROUP BY metric, season
+        """
+
+        use_rollup = _USE_MONTHLY_ROLLUP and covers_whole_months(start_date, end_date)
+        if use_rollup:
+            # Whole-month ranges are answered from the monthly rollup instead of every reading
+            rollup_clauses = []
+            season_params = []
+            if location_id:
+                rollup_clauses.append("r.location_id = %s")
+                season_params.append(location_id)
+            if start_date:
+                rollup_clauses.append("(r.year, r.month) >= (YEAR(%s), MONTH(%s))")
+                season_params.extend([start_date, start_date])
+            if end_date:
+                rollup_clauses.append("(r.year, r.month) <= (YEAR(%s), MONTH(%s))")
+                season_params.extend([end_date, end_date])
+            if metric:
+                rollup_clauses.append("LOWER(m.name) = %s")
+                season_params.append(metric.lower())
+            if quality_threshold:
+                rollup_clauses.append("LOWER(r.quality) IN (%s)" % ','.join(['%s'] * len(allowed_qualities)))
+                season_params.extend(allowed_qualities)
+            rollup_where_sql = " AND ".join(rollup_clauses)
+            if rollup_where_sql:
+                rollup_where_sql = "WHERE " + rollup_where_sql
+
+            rollup_season_query = f"""
+                SELECT
+                    metric,
+                    season,
+                    SUM(sum_value) / SUM(value_count),
+                    SUM(value_count),
+                    MAX(first_val),
+                    MAX(last_val)
+                FROM (
+                    SELECT
+                        m.name AS metric,
+                        MOD(r.month, 12) DIV 3 AS season,
+                        r.sum_value,
+                        r.value_count,
+                        FIRST_VALUE(r.first_reading) OVER (
+                            PARTITION BY m.name, MOD(r.month, 12) DIV 3 ORDER BY r.first_date
+                        ) AS first_val,
+                        LAST_VALUE(r.last_reading) OVER (
+                            PARTITION BY m.name, MOD(r.month, 12) DIV 3 ORDER BY r.last_date
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                        ) AS last_val
+                    FROM climate_data_monthly r
+                    JOIN metrics m ON r.metric_id = m.id
+                    {rollup_where_sql}
+                ) seasonal
+                GROUP BY metric, season
+            """
+        # Runs on its own pooled connection, overlapping the readings fetch below
+        if use_rollup:
+            season_future = _trends_executor.submit(_fetch_rollup_seasons, rollup_season_query, tuple(season_params))
+        else:
+            season_future = _trends_executor.submit(db.fetch_all, raw_season_query, tuple(params))
+
+        # --- Fetch metric names and units for all metrics ---
+        cur = db.get_db().cursor()
+        cur.execute("SELECT id, name, unit FROM metrics")
+        metric_info = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
         cur.close()
 
-        # --- Fetch climate data with quality ---
+        # --- Fetch climate data as numeric columns, grouped by metric and ordered by date ---
         query = f"""
             SELECT
-                m.name AS metric,
-                c.date,
+                c.metric_id,
+                TO_DAYS(c.date),
                 c.value,
-                c.quality
+                {_QUALITY_CODE_SQL}
             FROM climate_data c
             JOIN metrics m ON c.metric_id = m.id
             {where_sql}
-            ORDER BY c.date ASC
+            ORDER BY c.metric_id, c.date ASC
         """
 
-        cur = mysql.connection.cursor()
+        cur = db.get_db().cursor()
         cur.execute(query, tuple(params))
         rows = cur.fetchall()
         cur.close()
+        readings = np.array(list(rows), dtype=_READING_DTYPE)
+        del rows
 
-        metrics_data = {}
-        for row in rows:
-            metric_name = row[0]
-            date = row[1]
-            value = row[2]
-            quality = row[3]
-            if metric_name not in metrics_data:
-                metrics_data[metric_name] = []
-            metrics_data[metric_name].append((date, value, quality))
+        # Rows are sorted by metric_id, so each metric is one contiguous slice
+        group_starts = np.flatnonzero(np.diff(readings['metric_id'])) + 1
+        metric_groups = np.split(readings, group_starts) if len(readings) else []
+
+        # Metrics are independent and the kernel releases the GIL, so run them in parallel
+        trend_futures = {
+            int(group['metric_id'][0]): _trends_executor.submit(_compute_metric_trend, group)
+            for group in metric_groups
+            if len(group) >= 2
+        }
+
+        season_rows = season_future.result()
+        # A missing, empty or stale rollup won't account for every matching reading; aggregate the raw rows instead
+        if use_rollup and (season_rows is None or sum(int(row[3]) for row in season_rows) != len(readings)):
+            if season_rows is not None:
+                logger.warning("Monthly rollup out of date for trends query, aggregating raw readings")
+            season_rows = db.fetch_all(raw_season_query, tuple(params))
+
+        season_stats = {}
+        for row in season_rows:
+            season_stats.setdefault(row[0], {})[int(row[1])] = (float(row[2]), int(row[3]), row[4], row[5])
 
         trends_data = {}
-        for metric_name, data_points in metrics_data.items():
-            if len(data_points) < 2:
+        for group in metric_groups:
+            metric_id = int(group['metric_id'][0])
+            metric_name, unit = metric_info[metric_id]
+            if metric_id not in trend_futures:
                 trends_data[metric_name] = {
                     "trend": {
                         "direction": None,
                         "rate": None,
-                        "unit": metric_units.get(metric_name, None),
+                        "unit": unit,
                         "confidence": 0.0
                     },
                     "anomalies": [],
@@ -872,56 +1051,27 @@ def get_trends():
                 }
                 continue
 
-            import numpy as np
-            dates = np.array([dp[0].toordinal() for dp in data_points])
-            values = np.array([dp[1] for dp in data_points])
-
-            slope = float(np.polyfit(dates, values, 1)[0])
-            trend_direction = "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable"
-            rate_of_change = float(slope)
-
-            mean = float(np.mean(values))
-            std = float(np.std(values))
-            anomalies = [
-                {
-                    "date": data_points[i][0].strftime('%Y-%m-%d'),
-                    "value": float(data_points[i][1]),
-                    "deviation": float(abs(data_points[i][1] - mean)),
-                    "quality": data_points[i][2]
-                }
-                for i in range(len(data_points))
-                if abs(data_points[i][1] - mean) > 2 * std
-            ]
-
-            # Seasonality detection (group by season)
-            season_map = {
-                12: "winter", 1: "winter", 2: "winter",
-                3: "spring", 4: "spring", 5: "spring",
-                6: "summer", 7: "summer", 8: "summer",
-                9: "fall", 10: "fall", 11: "fall"
-            }
-            season_groups = {"winter": [], "spring": [], "summer": [], "fall": []}
-            for i, (date, value, quality) in enumerate(data_points):
-                season = season_map[date.month]
-                season_groups[season].append(value)
+            trend_direction, rate_of_change, anomalies = trend_futures[metric_id].result()
+
+            # Seasonality detection (aggregated per season in SQL)
             pattern = {}
-            for season, vals in season_groups.items():
-                if vals:
-                    avg = float(np.mean(vals))
-                    trend = "stable"
-                    if len(vals) > 1:
-                        trend = "increasing" if vals[-1] > vals[0] else "decreasing" if vals[-1] < vals[0] else "stable"
-                    pattern[season] = {"avg": avg, "trend": trend}
-            detected = bool(any(len(vals) > 0 for vals in season_groups.values()))
+            season_total = 0
+            for s, (avg, count, first_val, last_val) in sorted(season_stats.get(metric_name, {}).items()):
+                trend = "stable"
+                if count > 1:
+                    trend = "increasing" if last_val > first_val else "decreasing" if last_val < first_val else "stable"
+                pattern[_SEASON_NAMES[s]] = {"avg": avg, "trend": trend}
+                season_total += count
+            detected = bool(pattern)
             period = "yearly" if detected else None
-            seasonality_confidence = float(min(1.0, sum(len(vals) for vals in season_groups.values()) / 30.0))
+            seasonality_confidence = min(1.0, season_total / 30.0)
 
             trends_data[metric_name] = {
                 "trend": {
                     "direction": trend_direction,
                     "rate": rate_of_change,
-                    "unit": metric_units.get(metric_name, None),
-                    "confidence": float(min(1.0, len(values) / 30.0))
+                    "unit": unit,
+                    "confidence": min(1.0, len(group) / 30.0)
                 },
                 "anomalies": anomalies,
                 "seasonality": {
@@ -933,13 +1083,14 @@ def get_trends():
             }
 
         result = {"data": trends_data}
-        cache.set(cache_key, result, timeout=600)
-        logger.info(f"Cache set for trends: {cache_key}")
-        return jsonify(result), 200
+        cached_json_set(cache, cache_key, result, get_cache_tag(location_id, metric), timeout=DERIVED_CACHE_TIMEOUT)
+        logger.info("Cache set for trends: %s", cache_key)
+        return ojsonify(result, 200)
     except Exception as e:
-        logger.error(f"Error fetching trends for location_id={location_id}, metric={metric}, quality_threshold={quality_threshold}: {str(e)}")
+        logger.error("Error fetching trends for location_id=%s, metric=%s, quality_threshold=%s: %s", location_id, metric, quality_threshold, e)
         return error_response(f"Failed to fetch trends: {str(e)}", 500)
 
 if __name__ == '__main__':
     clear_old_versioned_cache_keys(cache)
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    # Development server only; use wsgi.py with gunicorn in production
+    app.run(host="0.0.0.0", port=5001, debug=os.environ.get('FLASK_DEBUG') == '1')
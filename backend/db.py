@@ -0,0 +1,53 @@
+import os
+from flask import g
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+
+# Load DB config from environment variables
+DB_URL = URL.create(
+    "mysql+mysqldb",
+    username=os.environ.get('MYSQL_USER', 'root'),
+    password=os.environ.get('MYSQL_PASSWORD', ''),
+    host=os.environ.get('MYSQL_HOST', 'localhost'),
+    database=os.environ.get('MYSQL_DB', 'climate_data')
+)
+
+POOL_SIZE = 10
+
+# Pooled connections so requests don't pay the TCP + auth handshake each time
+engine = create_engine(DB_URL, pool_size=POOL_SIZE, pool_pre_ping=True, pool_recycle=300)
+
+def get_db():
+    """
+    Return the pooled MySQLdb connection for the current request, checking one out on first use.
+    """
+    if 'db_conn' not in g:
+        g.db_conn = engine.raw_connection()
+    return g.db_conn
+
+def close_db(exception=None):
+    """
+    Return the request's connection to the pool (rolled back by the pool on check-in).
+    """
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn.close()
+
+def fetch_all(query, params=()):
+    """
+    Run a read query on its own pooled connection and return all rows.
+    Safe to call from worker threads, which have no request context.
+    """
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        try:
+            cur.execute(query, params)
+            return cur.fetchall()
+        finally:
+            cur.close()
+    finally:
+        conn.close()
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
\ No newline at end of file
@@ -1,28 +1,35 @@
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 import os
-import glob
-from datetime import datetime
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), 'logs')
-os.makedirs(LOG_DIR, exist_ok=True)
 
-# Save log file with date in the name
-LOG_FILE = os.path.join(LOG_DIR, f'app_{datetime.now().strftime("%Y-%m-%d")}.log')
+# Current log file; rotated copies get a date suffix (app.log.YYYY-MM-DD).
+# The base name must stay fixed across restarts so backupCount can find and prune old files.
+LOG_FILE = os.path.join(LOG_DIR, 'app.log')
 
 logger = logging.getLogger('EcoVisionLogger')
 logger.setLevel(logging.INFO)
 
-handler = TimedRotatingFileHandler(LOG_FILE, when='midnight', backupCount=7)
-formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+if os.environ.get('LOG_TO_STDERR') == '1':
+    # Multi-process servers (gunicorn): every worker rotating the same file would clobber
+    # each other's rollovers, so log to stderr and let the process manager collect it
+    handler = logging.StreamHandler(sys.stderr)
+else:
+    os.makedirs(LOG_DIR, exist_ok=True)
+    # Rotates at midnight and keeps 7 days of backups; the handler deletes older files itself.
+    # delay=True defers opening the file until the first record is written.
+    # Single-process use only: the rollover is not safe with several processes sharing app.log.
+    handler = TimedRotatingFileHandler(LOG_FILE, when='midnight', backupCount=7, delay=True)
+formatter = logging.Formatter('%(asctime)s %(process)d %(levelname)s %(message)s')
 handler.setFormatter(formatter)
-logger.addHandler(handler)
 
-def cleanup_old_logs():
-    log_files = sorted(glob.glob(os.path.join(LOG_DIR, 'app_*.log*')))
-    if len(log_files) > 7:
-        for old_file in log_files[:-7]:
-            try:
-                os.remove(old_file)
-            except Exception as e:
-                logger.error(f"Failed to remove old log file {old_file}: {e}")
\ No newline at end of file
+# Request threads only enqueue records; a background listener thread does the I/O
+log_queue = queue.Queue(-1)
+logger.addHandler(QueueHandler(log_queue))
+listener = QueueListener(log_queue, handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
\ No newline at end of file
@@ -2,8 +2,9 @@ import json
 import MySQLdb
 import os
 from logger import logger
-from utils.constants import QUALITY_VALUES
-from utils.helpers import clear_forever_cache_keys, is_valid_id
+from utils.constants import QUALITY_VALUES_SET
+from utils.config import get_invalidation_tags
+from utils.helpers import clear_forever_cache_keys, invalidate_tags, is_valid_id
 from app import cache
 
 # Load DB config from environment variables
@@ -58,117 +59,230 @@ def create_db_and_tables():
             FOREIGN KEY (location_id) REFERENCES locations(id),
             FOREIGN KEY (metric_id) REFERENCES metrics(id),
             CHECK (quality IN ('excellent', 'good', 'questionable', 'poor')),
-            INDEX idx_location_id (location_id),
-            INDEX idx_metric_id (metric_id),
-            INDEX idx_date (date),
-            INDEX idx_quality (quality)
+            -- Covering index for per-location summary/trends scans (filter + ORDER BY date, no row lookups)
+            INDEX idx_loc_metric_date_cov (location_id, metric_id, date, quality, value),
+            -- Cross-location queries filtered by metric
+            INDEX idx_metric_date (metric_id, date),
+            -- Unfiltered climate pagination (ORDER BY date LIMIT ...)
+            INDEX idx_date (date)
+        );
+    """)
+    migrate_climate_data_indexes(cursor)
+    # Monthly rollup of climate_data, so seasonal aggregates read a few rows per month instead of every reading
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS climate_data_monthly (
+            location_id INT NOT NULL,
+            metric_id INT NOT NULL,
+            quality VARCHAR(20) NOT NULL,
+            year SMALLINT NOT NULL,
+            month TINYINT NOT NULL,
+            sum_value DECIMAL(20, 4) NOT NULL,
+            sum_value_sq DOUBLE NOT NULL,
+            value_count INT NOT NULL,
+            min_value FLOAT NOT NULL,
+            max_value FLOAT NOT NULL,
+            first_date DATE NOT NULL,
+            first_reading FLOAT NOT NULL,
+            last_date DATE NOT NULL,
+            last_reading FLOAT NOT NULL,
+            PRIMARY KEY (location_id, metric_id, quality, year, month),
+            FOREIGN KEY (location_id) REFERENCES locations(id),
+            FOREIGN KEY (metric_id) REFERENCES metrics(id),
+            INDEX idx_metric_month (metric_id, year, month)
         );
     """)
     db.commit()
     cursor.close()
     db.close()
 
+# climate_data indexes added after the table was first released, and the ones they replace
+CLIMATE_DATA_INDEXES = {
+    "idx_loc_metric_date_cov": "(location_id, metric_id, date, quality, value)",
+    "idx_metric_date": "(metric_id, date)",
+}
+OBSOLETE_CLIMATE_DATA_INDEXES = ("idx_location_id", "idx_metric_id", "idx_quality")
+
+def migrate_climate_data_indexes(cursor):
+    """
+    Bring the indexes of an existing climate_data table up to date (a no-op on freshly created tables).
+    The composite indexes are added before the single-column ones are dropped, so the foreign keys stay backed.
+    """
+    cursor.execute(
+        "SELECT DISTINCT index_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = 'climate_data'"
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    for name, columns in CLIMATE_DATA_INDEXES.items():
+        if name not in existing:
+            logger.info("Adding index %s to climate_data", name)
+            cursor.execute(f"ALTER TABLE climate_data ADD INDEX {name} {columns}")
+    for name in OBSOLETE_CLIMATE_DATA_INDEXES:
+        if name in existing:
+            logger.info("Dropping index %s from climate_data", name)
+            cursor.execute(f"ALTER TABLE climate_data DROP INDEX {name}")
+
+LOCATION_INSERT = "INSERT IGNORE INTO locations (id, name, country, latitude, longitude, region) VALUES (%s, %s, %s, %s, %s, %s)"
+METRIC_INSERT = "INSERT IGNORE INTO metrics (id, name, display_name, unit, description) VALUES (%s, %s, %s, %s, %s)"
+CLIMATE_DATA_INSERT = "INSERT IGNORE INTO climate_data (id, location_id, metric_id, date, value, quality) VALUES (%s, %s, %s, %s, %s, %s)"
+
+# Recompute the monthly rollup from climate_data (first/last are the earliest/latest readings in the month)
+REFRESH_MONTHLY_ROLLUP = """
+    INSERT INTO climate_data_monthly (
+        location_id, metric_id, quality, year, month,
+        sum_value, sum_value_sq, value_count, min_value, max_value,
+        first_date, first_reading, last_date, last_reading
+    )
+    SELECT
+        location_id, metric_id, quality, y, mo,
+        SUM(CAST(value AS DECIMAL(12, 4))), SUM(value * value), COUNT(*), MIN(value), MAX(value),
+        MIN(date), MAX(first_val), MAX(date), MAX(last_val)
+    FROM (
+        SELECT
+            location_id,
+            metric_id,
+            quality,
+            YEAR(date) AS y,
+            MONTH(date) AS mo,
+            date,
+            value,
+            FIRST_VALUE(value) OVER w AS first_val,
+            LAST_VALUE(value) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS last_val
+        FROM climate_data
+        WINDOW w AS (PARTITION BY location_id, metric_id, quality, YEAR(date), MONTH(date) ORDER BY date)
+    ) monthly
+    GROUP BY location_id, metric_id, quality, y, mo
+    ON DUPLICATE KEY UPDATE
+        sum_value = VALUES(sum_value),
+        sum_value_sq = VALUES(sum_value_sq),
+        value_count = VALUES(value_count),
+        min_value = VALUES(min_value),
+        max_value = VALUES(max_value),
+        first_date = VALUES(first_date),
+        first_reading = VALUES(first_reading),
+        last_date = VALUES(last_date),
+        last_reading = VALUES(last_reading)
+"""
+
+# Rows sent per executemany call
+INSERT_BATCH_SIZE = 1000
+
+def insert_in_batches(cursor, query, rows, label):
+    """
+    Insert rows with executemany in chunks of INSERT_BATCH_SIZE.
+    If a chunk fails, retry its rows one by one so only the bad rows are skipped and logged.
+    """
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        chunk = rows[start:start + INSERT_BATCH_SIZE]
+        try:
+            cursor.executemany(query, chunk)
+        except Exception:
+            for values in chunk:
+                try:
+                    cursor.execute(query, values)
+                except Exception as e:
+                    logger.error("Error inserting %s %s: %s", label, values, e)
+
 def seed():
     """
     Seed the database tables with data from sample_data.json.
     Skips records with missing or invalid primary/foreign keys and logs warnings/errors.
+    Rows are validated up front, then inserted in batches within a single transaction
+    that also refreshes the climate_data_monthly rollup.
     """
     try:
         with open('../data/sample_data.json') as f:
             data = json.load(f)
     except Exception as e:
-        logger.error(f"Error loading JSON file: {e}")
+        logger.error("Error loading JSON file: %s", e)
         return
 
-    db = MySQLdb.connect(**DB_CONFIG)
-    cursor = db.cursor()
-
-    # Seed locations table
+    # Validate locations
+    loc_rows = []
     for loc in data.get('locations', []):
         id_val = loc.get('id')
         if not is_valid_id(id_val):
-            logger.warning(f"Skipping location with invalid id (must be a positive integer): {loc}")
+            logger.warning("Skipping location with invalid id (must be a positive integer): %s", loc)
             continue
         if not loc.get('region'):
-            logger.warning(f"Skipping location with missing region: {loc}")
+            logger.warning("Skipping location with missing region: %s", loc)
             continue
-        try:
-            cursor.execute(
-                "INSERT IGNORE INTO locations (id, name, country, latitude, longitude, region) VALUES (%s, %s, %s, %s, %s, %s)",
-                (
-                    int(id_val),
-                    loc.get('name', None),
-                    loc.get('country', None),
-                    loc.get('latitude', None),
-                    loc.get('longitude', None),
-                    loc.get('region')
-                )
-            )
-        except Exception as e:
-            logger.error(f"Error inserting location {loc}: {e}")
+        loc_rows.append((
+            int(id_val),
+            loc.get('name', None),
+            loc.get('country', None),
+            loc.get('latitude', None),
+            loc.get('longitude', None),
+            loc.get('region')
+        ))
 
-    # Seed metrics table
+    # Validate metrics
+    metric_rows = []
     for met in data.get('metrics', []):
         id_val = met.get('id')
         if not is_valid_id(id_val):
-            logger.warning(f"Skipping metric with invalid id (must be a positive integer): {met}")
+            logger.warning("Skipping metric with invalid id (must be a positive integer): %s", met)
             continue
-        try:
-            cursor.execute(
-                "INSERT IGNORE INTO metrics (id, name, display_name, unit, description) VALUES (%s, %s, %s, %s, %s)",
-                (
-                    int(id_val),
-                    met.get('name', None),
-                    met.get('display_name', None),
-                    met.get('unit', None),
-                    met.get('description', None)
-                )
-            )
-        except Exception as e:
-            logger.error(f"Error inserting metric {met}: {e}")
+        metric_rows.append((
+            int(id_val),
+            met.get('name', None),
+            met.get('display_name', None),
+            met.get('unit', None),
+            met.get('description', None)
+        ))
 
-    # Seed climate_data table
+    # Validate climate_data
+    climate_rows = []
     for row in data.get('climate_data', []):
         id_val = row.get('id')
         location_id_val = row.get('location_id')
         metric_id_val = row.get('metric_id')
         # Validate all required IDs and fields
         if not is_valid_id(id_val):
-            logger.warning(f"Skipping climate_data with invalid id (must be a positive integer): {row}")
+            logger.warning("Skipping climate_data with invalid id (must be a positive integer): %s", row)
             continue
         if not is_valid_id(location_id_val):
-            logger.warning(f"Skipping climate_data with invalid location_id (must be a positive integer): {row}")
+            logger.warning("Skipping climate_data with invalid location_id (must be a positive integer): %s", row)
             continue
         if not is_valid_id(metric_id_val):
-            logger.warning(f"Skipping climate_data with invalid metric_id (must be a positive integer): {row}")
+            logger.warning("Skipping climate_data with invalid metric_id (must be a positive integer): %s", row)
             continue
         if not row.get('date'):
-            logger.warning(f"Skipping climate_data with missing date: {row}")
+            logger.warning("Skipping climate_data with missing date: %s", row)
             continue
         if row.get('value') is None:
-            logger.warning(f"Skipping climate_data with missing value: {row}")
+            logger.warning("Skipping climate_data with missing value: %s", row)
             continue
-        if row.get('quality') not in QUALITY_VALUES:
-            logger.warning(f"Skipping climate_data with invalid quality: {row}")
+        if row.get('quality') not in QUALITY_VALUES_SET:
+            logger.warning("Skipping climate_data with invalid quality: %s", row)
             continue
-        try:
-            cursor.execute(
-                "INSERT IGNORE INTO climate_data (id, location_id, metric_id, date, value, quality) VALUES (%s, %s, %s, %s, %s, %s)",
-                (
-                    int(id_val),
-                    int(location_id_val),
-                    int(metric_id_val),
-                    row.get('date'),
-                    row.get('value'),
-                    row.get('quality')
-                )
-            )
-        except Exception as e:
-            logger.error(f"Error inserting climate_data {row}: {e}")
+        climate_rows.append((
+            int(id_val),
+            int(location_id_val),
+            int(metric_id_val),
+            row.get('date'),
+            row.get('value'),
+            row.get('quality')
+        ))
 
+    db = MySQLdb.connect(**DB_CONFIG)
+    # One transaction for the whole seed, committed once at the end
+    db.autocommit(False)
+    cursor = db.cursor()
+    insert_in_batches(cursor, LOCATION_INSERT, loc_rows, "location")
+    insert_in_batches(cursor, METRIC_INSERT, metric_rows, "metric")
+    insert_in_batches(cursor, CLIMATE_DATA_INSERT, climate_rows, "climate_data")
+    cursor.execute(REFRESH_MONTHLY_ROLLUP)
     db.commit()
+    # Resolve metric names from the table, since climate_data may reference metrics seeded earlier
+    cursor.execute("SELECT id, name FROM metrics")
+    metric_names = dict(cursor.fetchall())
+    affected_tags = set()
+    for _, location_id_val, metric_id_val, *_ in climate_rows:
+        affected_tags |= get_invalidation_tags(location_id_val, metric_names.get(metric_id_val))
     cursor.close()
     db.close()
+    # Drop only the cached summary/trends results that depend on the ingested data
+    invalidate_tags(cache, affected_tags)
     logger.info("Database seeded successfully.")
 
 if __name__ == "__main__":
@@ -1,16 +1,4 @@
 import pytest
-import MySQLdb
-import flask_mysqldb
-
-# Patch MySQL teardown to suppress OperationalError during test teardown
-def safe_teardown(self, exception):
-    try:
-        orig_teardown(self, exception)
-    except MySQLdb.OperationalError:
-        pass
-
-orig_teardown = flask_mysqldb.MySQL.teardown
-flask_mysqldb.MySQL.teardown = safe_teardown
 
 from app import app
 
@@ -58,6 +46,16 @@ def test_get_climate_data_pagination(client):
     assert 'data' in response.json
     assert 'meta' in response.json
 
+def test_get_climate_data_quality_threshold_good(client):
+    response = client.get('/api/v1/climate?location_id=1&quality_threshold=good')
+    assert response.status_code == 200
+    assert all(row['quality'] in ('excellent', 'good') for row in response.json['data'])
+
+def test_get_climate_data_quality_threshold_excellent(client):
+    response = client.get('/api/v1/climate?location_id=1&quality_threshold=excellent')
+    assert response.status_code == 200
+    assert all(row['quality'] == 'excellent' for row in response.json['data'])
+
 # /api/v1/locations tests
 def test_get_locations(client):
     response = client.get('/api/v1/locations')
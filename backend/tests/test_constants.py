@@ -0,0 +1,7 @@
+from utils.constants import QUALITY_AT_LEAST
+
+def test_quality_at_least():
+    assert QUALITY_AT_LEAST['excellent'] == ('excellent',)
+    assert QUALITY_AT_LEAST['good'] == ('excellent', 'good')
+    assert QUALITY_AT_LEAST['questionable'] == ('excellent', 'good', 'questionable')
+    assert QUALITY_AT_LEAST['poor'] == ('excellent', 'good', 'questionable', 'poor')
@@ -0,0 +1,91 @@
+import fakeredis
+import orjson
+import pytest
+from flask import Flask
+from flask_caching import Cache
+
+from utils.config import get_cache_tag, get_invalidation_tags, get_versioned_cache_key, DERIVED_DATA_VERSION, ALGO_VERSION
+from utils.helpers import (
+    cached_json_get, cached_json_set, set_indexed, invalidate_tags, clear_old_versioned_cache_keys, COMPRESS_MIN_BYTES
+)
+
+@pytest.fixture
+def cache():
+    return Cache(Flask(__name__), config={'CACHE_TYPE': 'SimpleCache'})
+
+def test_cached_json_round_trip_small(cache):
+    value = {"data": {"temperature": {"avg": 21.5, "count": 3}}}
+    cached_json_set(cache, "small", value, "loc=1|metric=temperature")
+    assert cache.get("small")[:1] == b"j"
+    assert cached_json_get(cache, "small") == b'{"data":{"temperature":{"avg":21.5,"count":3}}}'
+
+def test_cached_json_round_trip_compressed(cache):
+    value = {"data": [{"date": "2025-01-01", "value": i} for i in range(200)]}
+    body = orjson.dumps(value)
+    assert len(body) >= COMPRESS_MIN_BYTES
+    cached_json_set(cache, "large", value, "loc=*|metric=*")
+    payload = cache.get("large")
+    assert payload[:1] == b"z"
+    assert len(payload) < len(body)
+    assert cached_json_get(cache, "large") == body
+
+def test_cached_json_get_miss(cache):
+    assert cached_json_get(cache, "missing") is None
+
+# Redis-backed tag index (the only backend that records tags)
+@pytest.fixture
+def redis_cache():
+    return Cache(Flask(__name__), config={
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_HOST': fakeredis.FakeStrictRedis(),
+        'CACHE_KEY_PREFIX': 'ecovision:'
+    })
+
+def test_invalidate_tags_deletes_only_dependent_keys(redis_cache):
+    set_indexed(redis_cache, "summary:a", 1, get_cache_tag(1, "temperature"))
+    set_indexed(redis_cache, "summary:b", 2, get_cache_tag(2, "temperature"))
+    set_indexed(redis_cache, "trends:c", 3, get_cache_tag(1, "humidity"))
+
+    invalidate_tags(redis_cache, [get_cache_tag(1, "temperature")])
+
+    assert redis_cache.get("summary:a") is None
+    assert redis_cache.get("summary:b") == 2
+    assert redis_cache.get("trends:c") == 3
+    assert not redis_cache.cache._write_client.exists("ecovision:tag:loc=1|metric=temperature")
+
+def test_invalidate_tags_covers_wildcard_tags(redis_cache):
+    set_indexed(redis_cache, "exact", 1, get_cache_tag(1, "temperature"))
+    set_indexed(redis_cache, "all_metrics_loc1", 2, get_cache_tag(1, None))
+    set_indexed(redis_cache, "temperature_all_locs", 3, get_cache_tag(None, "temperature"))
+    set_indexed(redis_cache, "everything", 4, get_cache_tag(None, None))
+    set_indexed(redis_cache, "other_loc", 5, get_cache_tag(2, None))
+    set_indexed(redis_cache, "other_metric", 6, get_cache_tag(None, "humidity"))
+
+    invalidate_tags(redis_cache, get_invalidation_tags(1, "temperature"))
+
+    for key in ("exact", "all_metrics_loc1", "temperature_all_locs", "everything"):
+        assert redis_cache.get(key) is None
+    assert redis_cache.get("other_loc") == 5
+    assert redis_cache.get("other_metric") == 6
+
+def test_set_indexed_expires_tag_set_with_timeout(redis_cache):
+    set_indexed(redis_cache, "summary:a", 1, get_cache_tag(1, None), timeout=600)
+    ttl = redis_cache.cache._write_client.ttl("ecovision:tag:loc=1|metric=*")
+    assert 0 < ttl <= 600
+
+def test_clear_old_versioned_cache_keys_removes_stale_versions(redis_cache):
+    current = get_versioned_cache_key("summary", {"location_id": "1"})
+    stale_data = current.replace(f"data_ver={DERIVED_DATA_VERSION}", "data_ver=old")
+    stale_algo = current.replace(f"algo_ver={ALGO_VERSION}", "algo_ver=old")
+    tag = get_cache_tag(1, None)
+    for key in (current, stale_data, stale_algo):
+        set_indexed(redis_cache, key, 1, tag)
+    redis_cache.set("locations", [1])
+
+    clear_old_versioned_cache_keys(redis_cache)
+
+    assert redis_cache.get(current) == 1
+    assert redis_cache.get(stale_data) is None
+    assert redis_cache.get(stale_algo) is None
+    assert redis_cache.get("locations") == [1]
+    assert redis_cache.cache._write_client.exists(f"ecovision:tag:{tag}")
@@ -0,0 +1,30 @@
+import numpy as np
+
+from utils.kernels import trend_kernel, DIRECTION_NAMES
+
+def test_trend_kernel_matches_numpy():
+    rng = np.random.default_rng(42)
+    ordinals = np.arange(738000, 738200, dtype=np.float64)
+    values = 0.05 * ordinals + rng.normal(0, 3, ordinals.shape[0])
+    values[[20, 150]] += 40
+
+    direction_code, rate, mean, anomaly_mask = trend_kernel(ordinals, values)
+
+    assert np.isclose(rate, np.polyfit(ordinals, values, 1)[0])
+    assert np.isclose(mean, np.mean(values))
+    assert np.array_equal(anomaly_mask, np.abs(values - np.mean(values)) > 2 * np.std(values))
+    assert DIRECTION_NAMES[direction_code] == "increasing"
+
+def test_trend_kernel_decreasing():
+    ordinals = np.arange(10, dtype=np.float64)
+    direction_code, rate, _, _ = trend_kernel(ordinals, -2.0 * ordinals)
+    assert np.isclose(rate, -2.0)
+    assert DIRECTION_NAMES[direction_code] == "decreasing"
+
+def test_trend_kernel_constant_series_is_stable():
+    ordinals = np.arange(10, dtype=np.float64)
+    direction_code, rate, mean, anomaly_mask = trend_kernel(ordinals, np.full(10, 7.5))
+    assert rate == 0.0
+    assert mean == 7.5
+    assert not anomaly_mask.any()
+    assert DIRECTION_NAMES[direction_code] == "stable"
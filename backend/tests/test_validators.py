@@ -0,0 +1,33 @@
+import pytest
+
+from utils.validators import is_valid_int, covers_whole_months
+
+# is_valid_int tests
+@pytest.mark.parametrize("val", [1, 42, "1", "42", " 7 ", "007"])
+def test_is_valid_int_accepts_positive_integers(val):
+    assert is_valid_int(val)
+
+@pytest.mark.parametrize("val", [
+    0, -1, "0", "000", "-1", "+1", "", "   ", "1.5", "abc", "١٢", None, True, False, [], {}
+])
+def test_is_valid_int_rejects_invalid_values(val):
+    assert not is_valid_int(val)
+
+# covers_whole_months tests
+def test_covers_whole_months_open_range():
+    assert covers_whole_months(None, None)
+
+def test_covers_whole_months_month_boundaries():
+    assert covers_whole_months("2025-01-01", "2025-03-31")
+    assert covers_whole_months("2025-01-01", None)
+    assert covers_whole_months(None, "2025-04-30")
+
+def test_covers_whole_months_leap_february():
+    assert covers_whole_months("2024-02-01", "2024-02-29")
+    assert not covers_whole_months("2024-02-01", "2024-02-28")
+    assert covers_whole_months("2025-02-01", "2025-02-28")
+
+def test_covers_whole_months_partial_months():
+    assert not covers_whole_months("2025-01-02", "2025-03-31")
+    assert not covers_whole_months("2025-01-01", "2025-03-30")
+    assert not covers_whole_months("2025-01-15", None)
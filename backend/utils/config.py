@@ -1,9 +1,18 @@
+from functools import lru_cache
+
 DERIVED_VER_KEY = "ver:derived:data"
 ALGO_VER_KEY = "ver:derived:algo"
 
 # Change these version numbers anytime to invalidate cache
 DERIVED_DATA_VERSION = "1"
-ALGO_VERSION = "1"
+ALGO_VERSION = "3"
+
+# Cache lifetimes (seconds) for derived summary/trends results. With Redis, ingestion
+# invalidates affected keys by tag, so the TTL only bounds staleness for changes made
+# outside the seeder. The in-process cache can't be invalidated by the seeder, so its
+# TTL is the only thing bounding staleness and stays short.
+SHARED_CACHE_TIMEOUT = 3600
+LOCAL_CACHE_TIMEOUT = 600
 
 def get_version(key):
     if key == DERIVED_VER_KEY:
@@ -12,8 +21,34 @@ def get_version(key):
         return ALGO_VERSION
     return "1"
 
-def get_versioned_cache_key(endpoint, args):
+@lru_cache(maxsize=4096)
+def _versioned_cache_key(endpoint, items):
     derived_ver = get_version(DERIVED_VER_KEY)
     algo_ver = get_version(ALGO_VER_KEY)
-    param_str = "&".join(f"{k}={v}" for k, v in sorted(args.items()))
-    return f"{endpoint}:{param_str}:data_ver={derived_ver}:algo_ver={algo_ver}"
\ No newline at end of file
+    param_str = "&".join(f"{k}={v}" for k, v in items)
+    return f"{endpoint}:{param_str}:data_ver={derived_ver}:algo_ver={algo_ver}"
+
+def get_versioned_cache_key(endpoint, args):
+    # Memoized per (endpoint, args); versions are constants, so call
+    # _versioned_cache_key.cache_clear() if they are changed at runtime
+    return _versioned_cache_key(endpoint, tuple(sorted(args.items())))
+
+def get_cache_tag(location_id, metric):
+    """
+    Build the invalidation tag for a cached result. A missing filter means the result
+    depends on every location/metric and is tagged with a '*' wildcard.
+    """
+    location_part = str(int(location_id)) if location_id else "*"
+    metric_part = metric.lower() if metric else "*"
+    return f"loc={location_part}|metric={metric_part}"
+
+def get_invalidation_tags(location_id, metric):
+    """
+    Return every tag whose cached results depend on data for (location_id, metric).
+    """
+    return {
+        get_cache_tag(location_id, metric),
+        get_cache_tag(location_id, None),
+        get_cache_tag(None, metric),
+        get_cache_tag(None, None)
+    }
\ No newline at end of file
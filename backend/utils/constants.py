@@ -1,5 +1,20 @@
 # Allowed quality values for climate data
 QUALITY_VALUES = ('excellent', 'good', 'questionable', 'poor')
+QUALITY_VALUES_SET = frozenset(QUALITY_VALUES)
+
+# Quality ranks (higher is better) used for quality_threshold filtering
+QUALITY_RANKS = {
+    'excellent': 3,
+    'good': 2,
+    'questionable': 1,
+    'poor': 0
+}
+
+# Qualities allowed for each quality_threshold (the threshold itself and anything better)
+QUALITY_AT_LEAST = {
+    threshold: tuple(q for q in QUALITY_VALUES if QUALITY_RANKS[q] >= rank)
+    for threshold, rank in QUALITY_RANKS.items()
+}
 
 # Quality weights for summary/statistics calculations
 QUALITY_WEIGHTS = {
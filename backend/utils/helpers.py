@@ -1,29 +1,113 @@
+import threading
+import orjson
+import zstandard
+from utils.validators import is_valid_int
+
+# Tag-based invalidation needs an index that every process can see, so it is only kept for
+# Redis (one set of cache keys per tag). In-process SimpleCache is private to each API process,
+# so the seed script can't reach it anyway; there entries rely on version-suffixed keys and TTLs.
+
+def _current_epoch():
+    from utils.config import DERIVED_DATA_VERSION, ALGO_VERSION
+    return (str(DERIVED_DATA_VERSION), str(ALGO_VERSION))
+
+def _redis_backend(cache):
+    """
+    Return (client, key_prefix) if the cache is Redis-backed, else (None, None).
+    """
+    backend = cache.cache
+    client = getattr(backend, "_write_client", None)
+    if client is None:
+        return None, None
+    return client, backend.key_prefix or ""
+
+def set_indexed(cache, key, value, tag, timeout=None):
+    """
+    Set a cache value and, with Redis, record it under its invalidation tag.
+    """
+    cache.set(key, value, timeout=timeout)
+    client, prefix = _redis_backend(cache)
+    if client is None:
+        return
+    tag_key = f"{prefix}tag:{tag}"
+    pipe = client.pipeline()
+    pipe.sadd(tag_key, f"{prefix}{key}")
+    if timeout:
+        # Let the tag set expire along with its newest member
+        pipe.expire(tag_key, timeout)
+    pipe.execute()
+
+def invalidate_tags(cache, tags):
+    """
+    Delete exactly the cache keys recorded under the given tags (Redis only; no-op otherwise).
+    """
+    client, prefix = _redis_backend(cache)
+    if client is None:
+        return
+    for tag in tags:
+        tag_key = f"{prefix}tag:{tag}"
+        keys = client.smembers(tag_key)
+        client.delete(tag_key, *keys)
+
 def clear_old_versioned_cache_keys(cache):
     """
-    Remove cache keys with outdated version numbers.
-    Only works for SimpleCache (in-memory dict).
+    Remove cache keys written under outdated version numbers.
+    With Redis, stale keys survive restarts, so scan the versioned keys under the cache prefix.
+    In-process caches start empty on every restart, so there is nothing to remove.
     """
-    from utils.config import DERIVED_DATA_VERSION, ALGO_VERSION
-    cache_dict = cache.cache._cache  # SimpleCache internal dict
-    current_data_ver = str(DERIVED_DATA_VERSION)
-    current_algo_ver = str(ALGO_VERSION)
-    keys_to_delete = []
-    for key in cache_dict.keys():
-        if "data_ver=" in key or "algo_ver=" in key:
-            parts = key.split(":")
-            for part in parts:
-                if part.startswith("data_ver="):
-                    ver = part.split("=")[1]
-                    if ver < current_data_ver:
-                        keys_to_delete.append(key)
-                        break
-                if part.startswith("algo_ver="):
-                    ver = part.split("=")[1]
-                    if ver < current_algo_ver:
-                        keys_to_delete.append(key)
-                        break
-    for key in keys_to_delete:
-        cache.delete(key)
+    from utils.config import _versioned_cache_key
+    _versioned_cache_key.cache_clear()
+    client, prefix = _redis_backend(cache)
+    if client is None:
+        return
+    current_suffix = ":data_ver={}:algo_ver={}".format(*_current_epoch()).encode()
+    stale = [
+        key for key in client.scan_iter(match=f"{prefix}*:data_ver=*", count=1000)
+        if not key.endswith(current_suffix)
+    ]
+    if stale:
+        client.delete(*stale)
+
+# Cached JSON payloads smaller than this are stored uncompressed (zstd overhead dominates)
+COMPRESS_MIN_BYTES = 1024
+# One-byte header on cached payloads: raw JSON or zstd-compressed JSON
+_RAW_JSON = b"j"
+_ZSTD_JSON = b"z"
+# zstd (de)compressors aren't safe to share between threads, so keep one per thread
+_zstd = threading.local()
+
+def _compressor():
+    if not hasattr(_zstd, "compressor"):
+        _zstd.compressor = zstandard.ZstdCompressor(level=3)
+    return _zstd.compressor
+
+def _decompressor():
+    if not hasattr(_zstd, "decompressor"):
+        _zstd.decompressor = zstandard.ZstdDecompressor()
+    return _zstd.decompressor
+
+def cached_json_set(cache, key, value, tag, timeout=None):
+    """
+    Serialize value with orjson, zstd-compress it if large enough, and store it under its invalidation tag.
+    """
+    body = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    if len(body) >= COMPRESS_MIN_BYTES:
+        payload = _ZSTD_JSON + _compressor().compress(body)
+    else:
+        payload = _RAW_JSON + body
+    set_indexed(cache, key, payload, tag, timeout=timeout)
+
+def cached_json_get(cache, key):
+    """
+    Return the cached JSON body (bytes) for key, or None on a miss.
+    The body is returned still serialized so it can be sent as the response as-is.
+    """
+    payload = cache.get(key)
+    if not payload:
+        return None
+    if payload[:1] == _ZSTD_JSON:
+        return _decompressor().decompress(payload[1:])
+    return payload[1:]
 
 def clear_forever_cache_keys(cache):
     """
@@ -36,7 +120,4 @@ def is_valid_id(val):
     """
     Check if the given value is a valid positive integer for use as a primary key.
     """
-    try:
-        return val is not None and str(val).strip() != "" and int(val) > 0
-    except (ValueError, TypeError):
-        return False
\ No newline at end of file
+    return is_valid_int(val)
\ No newline at end of file
@@ -0,0 +1,50 @@
+import numpy as np
+from numba import njit
+
+# Direction codes returned by trend_kernel
+DIRECTION_NAMES = {1: "increasing", -1: "decreasing", 0: "stable"}
+
+@njit(cache=True, fastmath=True, nogil=True)
+def trend_kernel(ordinals, values):
+    """
+    Compute the trend and anomalies for one metric series.
+    Expects float64 date ordinals and values sorted by date.
+    Returns (direction_code, rate, mean, anomaly_mask).
+    """
+    n = values.shape[0]
+
+    # First pass: means
+    x_sum = 0.0
+    y_sum = 0.0
+    for i in range(n):
+        x_sum += ordinals[i]
+        y_sum += values[i]
+    x_mean = x_sum / n
+    mean = y_sum / n
+
+    # Second pass: least-squares slope and variance
+    sxy = 0.0
+    sxx = 0.0
+    sq_sum = 0.0
+    for i in range(n):
+        dx = ordinals[i] - x_mean
+        dy = values[i] - mean
+        sxy += dx * dy
+        sxx += dx * dx
+        sq_sum += dy * dy
+    rate = sxy / sxx if sxx > 0 else 0.0
+    std = np.sqrt(sq_sum / n)
+
+    anomaly_mask = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        if abs(values[i] - mean) > 2 * std:
+            anomaly_mask[i] = True
+
+    direction_code = 1 if rate > 0 else -1 if rate < 0 else 0
+    return direction_code, rate, mean, anomaly_mask
+
+def warm_trend_kernel():
+    """
+    Trigger JIT compilation (or load the on-disk cache) so the first request doesn't pay for it.
+    """
+    trend_kernel(np.array([0.0, 1.0]), np.array([0.0, 1.0]))
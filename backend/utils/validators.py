@@ -1,28 +1,57 @@
+import calendar
 from datetime import datetime
+from functools import lru_cache
 
 def is_valid_int(val):
     """
     Returns True if val is a positive integer, else False.
     """
+    # Fast paths for the common cases: ints parsed from JSON and strings from query args
+    if isinstance(val, bool):
+        return False
+    if isinstance(val, int):
+        return val > 0
+    if isinstance(val, str):
+        s = val.strip()
+        return s.isascii() and s.isdigit() and s.strip("0") != ""
     try:
         return val is not None and str(val).strip() != "" and int(val) > 0
     except (ValueError, TypeError):
         return False
 
-def is_valid_date(val):
+@lru_cache(maxsize=1024)
+def _parse_date(val):
     """
-    Returns True if val matches YYYY-MM-DD format, else False.
+    Parse a YYYY-MM-DD string, returning None if it is invalid.
+    Cached because the same date filters repeat across requests (e.g. pagination).
     """
     try:
-        datetime.strptime(val, "%Y-%m-%d")
-        return True
+        return datetime.strptime(val, "%Y-%m-%d")
     except (ValueError, TypeError):
-        return False
+        return None
+
+def is_valid_date(val):
+    """
+    Returns True if val matches YYYY-MM-DD format, else False.
+    """
+    return isinstance(val, str) and _parse_date(val) is not None
     
 def is_valid_date_range(start_date, end_date):
-    try:
-        if not (is_valid_date(start_date) and is_valid_date(end_date)):
+    if not (isinstance(start_date, str) and isinstance(end_date, str)):
+        return False
+    start = _parse_date(start_date)
+    end = _parse_date(end_date)
+    return start is not None and end is not None and end >= start
+
+def covers_whole_months(start_date, end_date):
+    """
+    Returns True if the optional (already validated) date bounds fall on month boundaries,
+    so the range can be answered from monthly rollups.
+    """
+    if start_date and _parse_date(start_date).day != 1:
+        return False
+    if end_date:
+        end = _parse_date(end_date)
+        if end.day != calendar.monthrange(end.year, end.month)[1]:
             return False
-        return datetime.strptime(end_date, "%Y-%m-%d") >= datetime.strptime(start_date, "%Y-%m-%d")
-    except Exception:
-        return False
\ No newline at end of file
+    return True
\ No newline at end of file
@@ -0,0 +1,18 @@
+# wsgi.py - WSGI entry point for production servers, e.g.:
+#   gunicorn -w $(nproc) -k gthread --threads 4 -b 0.0.0.0:5001 --capture-output wsgi:app
+import os
+from dotenv import load_dotenv
+
+# gunicorn doesn't read .env the way `flask run` does; load it before db/app read the environment
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+
+# Several worker processes must not share the self-rotating log file, so log to stderr
+# (gunicorn forwards it to its error log) unless explicitly overridden
+os.environ.setdefault('LOG_TO_STDERR', '1')
+
+from app import app, cache
+from utils.helpers import clear_old_versioned_cache_keys
+
+clear_old_versioned_cache_keys(cache)
+
+application = app
\ No newline at end of file